@@ -1,7 +1,17 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+from flask import (Flask, Response, render_template, stream_template, request, redirect,
+                   url_for, session, flash, get_flashed_messages, jsonify)
+from jinja2 import FileSystemBytecodeCache
 import os
 import requests
 
+import assets
+import metrics
+from backend import backend
+from compression import CompressionMiddleware
+from cache import cache_key, dashboard_cache
+from motorcycles import MOTOS_PER_PAGE, motos_index
+from singleflight import backend_flight
+
 # ----------------------------------------
 # Configuración del Flask app
 # ----------------------------------------
@@ -14,8 +24,43 @@ app = Flask(
 )
 app.secret_key = "frontendsecret"
 
-# URL del backend desplegado en Railway
-BACKEND_URL = os.getenv("BACKEND_URL", "https://motosapi-production.up.railway.app")
+# Métricas (/metrics), cabeceras Server-Timing y logging por cola
+metrics.init_app(app)
+# Estáticos con hash de contenido, precomprimidos y con caché de un año
+assets.init_app(app)
+# Compresión gzip/brotli (y minificado opcional) de las páginas renderizadas
+app.wsgi_app = CompressionMiddleware(app.wsgi_app)
+logger = metrics.logger
+
+# Modo del dashboard: "buffered" arma la página completa en memoria,
+# "stream" envía la cabecera antes de llamar al backend y luego la tabla
+# por trozos (los errores aparecen dentro de la página, no como flash),
+# "paged" muestra solo una página del índice local de motos
+DASHBOARD_MODE = os.getenv("DASHBOARD_MODE", "buffered")
+DASHBOARD_STREAM_CHUNK = int(os.getenv("DASHBOARD_STREAM_CHUNK", str(64 * 1024)))
+
+# ----------------------------------------
+# Plantillas precompiladas
+# ----------------------------------------
+# El bytecode de Jinja se guarda en disco y todas las plantillas se compilan
+# al importar la app: con preload_app los workers las heredan ya listas y
+# ninguno compila plantillas en su primera petición.
+# Sin JINJA_CACHE_DIR se usa el directorio privado de Jinja (uno por
+# usuario, con permisos 0700); con JINJA_CACHE_DIR="" no se usa caché.
+JINJA_CACHE_DIR = os.getenv("JINJA_CACHE_DIR")
+if JINJA_CACHE_DIR is None:
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+elif JINJA_CACHE_DIR:
+    # Otro usuario con acceso al directorio podría plantar bytecode que
+    # luego se ejecuta: solo se acepta uno propio y cerrado
+    os.makedirs(JINJA_CACHE_DIR, mode=0o700, exist_ok=True)
+    stat = os.lstat(JINJA_CACHE_DIR)
+    if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+        raise RuntimeError(f"JINJA_CACHE_DIR={JINJA_CACHE_DIR} debe pertenecer al usuario "
+                           "actual y no tener permisos para otros")
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR)
+for template_name in app.jinja_env.list_templates():
+    app.jinja_env.get_template(template_name)
 
 # ----------------------------------------
 # Página principal
@@ -38,7 +83,7 @@ def register():
 
         data = {"email": email, "password": password}
         try:
-            response = requests.post(f"{BACKEND_URL}/register", json=data)
+            response = backend.post("/register", json=data)
             if response.status_code == 201:
                 flash("Usuario registrado exitosamente, ahora inicia sesión.", "success")
                 return redirect(url_for("login"))
@@ -65,9 +110,9 @@ def login():
 
         data = {"email": email, "password": password}
         try:
-            response = requests.post(f"{BACKEND_URL}/login", json=data)
-            # Ver qué devuelve el backend
-            print("RESPUESTA LOGIN:", response.text)
+            response = backend.post("/login", json=data)
+            # Nunca se registra el cuerpo: contiene el token
+            logger.info("Login: status %s", response.status_code)
             if response.status_code == 200:
                 token = response.json().get("token")
                 if token:
@@ -84,6 +129,149 @@ def login():
             flash("Error de conexión con el backend.", "danger")
     return render_template("login.html")
 
+# ----------------------------------------
+# Tabla de motos (con caché por usuario)
+# ----------------------------------------
+def fetch_motos_html(token):
+    """Descarga la tabla del backend revalidando la copia en caché.
+
+    Devuelve ``(status, html)``; ``html`` es ``None`` si el backend no
+    respondió con la tabla.
+    """
+    key = cache_key(token)
+    entry = dashboard_cache.get(key)
+    validators = entry.validators() if entry is not None else {}
+
+    # Peticiones idénticas (mismo usuario y mismos validadores) comparten
+    # una sola llamada al backend
+    flight_key = ("GET", "/motorcycles/tabla", key,
+                  validators.get("If-None-Match"), validators.get("If-Modified-Since"))
+    status, body, etag, last_modified = backend_flight.do(
+        flight_key, lambda: _get_motos_table(token, validators))
+
+    if status == 304 and entry is not None:
+        dashboard_cache.touch(key)
+        return 200, entry.body
+    if status == 200:
+        dashboard_cache.put(key, body, etag=etag, last_modified=last_modified)
+        return 200, body
+    if status == 401:
+        dashboard_cache.invalidate(key)
+    return status, None
+
+
+def _get_motos_table(token, validators):
+    headers = {"Authorization": f"Bearer {token}"}
+    headers.update(validators)
+    response = backend.get("/motorcycles/tabla", headers=headers)
+    body = response.text if response.status_code == 200 else None
+    return (response.status_code, body,
+            response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+
+# Marca que emiten los generadores de la tabla: lo renderizado hasta ahí se
+# envía de una vez en lugar de en decenas de trozos pequeños
+_STREAM_FLUSH = "<!--flush-->"
+
+
+def stream_motos_html(token, entry):
+    """Variante de ``fetch_motos_html`` que no carga la tabla en memoria.
+
+    Es un generador de trozos de HTML para ``stream_template``: la llamada
+    al backend se hace al recorrerlo, así que la cabecera de la página ya
+    salió mientras se espera la respuesta. Como la sesión ya se guardó, los
+    errores se muestran dentro de la página y no como mensajes flash. El
+    contenido se copia a la caché solo si cabe en una entrada. Un stream no
+    se puede compartir, así que este camino no pasa por ``backend_flight``.
+    """
+    yield _STREAM_FLUSH
+    key = cache_key(token)
+    headers = {"Authorization": f"Bearer {token}"}
+    if entry is not None:
+        headers.update(entry.validators())
+
+    try:
+        response = backend.get("/motorcycles/tabla", headers=headers, stream=True)
+    except requests.exceptions.RequestException:
+        if entry is not None:
+            # Backend caído o circuito abierto: se muestra la última copia
+            yield _alert("No se pudo conectar al backend. Mostrando los últimos datos disponibles.",
+                         "warning")
+            yield entry.body
+        else:
+            yield _alert("No se pudo conectar al backend.", "danger")
+        return
+
+    if response.status_code == 200:
+        yield from _iter_motos_table(response, key)
+        return
+
+    response.close()
+    if response.status_code == 304 and entry is not None:
+        dashboard_cache.touch(key)
+        yield entry.body
+    elif response.status_code == 401:
+        dashboard_cache.invalidate(key)
+        # Ya no se puede redirigir con la respuesta: lo hace el navegador
+        logout_url = url_for("logout")
+        yield _alert(f'Token inválido o expirado. <a href="{logout_url}">Inicia sesión nuevamente</a>.',
+                     "danger")
+        yield f'<script>window.location.replace("{logout_url}");</script>'
+    else:
+        yield _alert("Error al cargar las motos.", "danger")
+
+
+def _alert(message, category):
+    return f'<div class="alert alert-{category} mt-2" role="alert">{message}</div>'
+
+
+def _iter_motos_table(response, key):
+    if response.encoding is None:
+        response.encoding = "utf-8"
+    captured, captured_bytes = [], 0
+    try:
+        for chunk in response.iter_content(DASHBOARD_STREAM_CHUNK, decode_unicode=True):
+            if captured is not None:
+                captured.append(chunk)
+                captured_bytes += len(chunk)
+                if captured_bytes > dashboard_cache.max_entry_bytes:
+                    captured = None
+            yield chunk
+            yield _STREAM_FLUSH
+    except requests.exceptions.RequestException:
+        yield "<p>Se interrumpió la conexión con el backend.</p>"
+        return
+    finally:
+        response.close()
+
+    if captured is not None:
+        dashboard_cache.put(key, "".join(captured),
+                            etag=response.headers.get("ETag"),
+                            last_modified=response.headers.get("Last-Modified"))
+
+
+def _coalesce(chunks):
+    """Junta los trozos de ``stream_template`` y los envía en cada
+    ``_STREAM_FLUSH`` y al final."""
+    buffer = []
+    try:
+        for chunk in chunks:
+            if _STREAM_FLUSH not in chunk:
+                buffer.append(chunk)
+                continue
+            before, _, after = chunk.partition(_STREAM_FLUSH)
+            buffer.append(before)
+            out = "".join(buffer)
+            if out:
+                yield out
+            buffer = [after]
+        out = "".join(buffer)
+        if out:
+            yield out
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
 # ----------------------------------------
 # Dashboard
 # ----------------------------------------
@@ -93,36 +281,131 @@ def dashboard():
         flash("Debes iniciar sesión para acceder al dashboard.", "warning")
         return redirect(url_for("login"))
 
-    headers = {"Authorization": f"Bearer {session.get('token', '')}"}
+    token = session.get("token", "")
+    if DASHBOARD_MODE == "paged":
+        return _paged_dashboard(token)
+
+    key = cache_key(token)
+    entry = dashboard_cache.get(key)
+
+    if entry is not None and dashboard_cache.is_fresh(entry):
+        motos_html = entry.body
+    elif entry is not None and dashboard_cache.is_servable_stale(entry):
+        # Se sirve la copia vencida y se refresca en segundo plano
+        motos_html = entry.body
+        dashboard_cache.refresh_in_background(key, lambda: fetch_motos_html(token))
+    elif DASHBOARD_MODE == "stream":
+        # La tabla se pide al backend mientras ya se envía la página
+        motos_html = stream_motos_html(token, entry)
+    else:
+        try:
+            status, motos_html = fetch_motos_html(token)
+            if status == 401:
+                flash("Token inválido o expirado. Inicia sesión nuevamente.", "danger")
+                return redirect(url_for("logout"))
+            elif status != 200:
+                motos_html = "<p>Error al cargar las motos.</p>"
+                flash("Error al cargar las motos.", "danger")
+        except requests.exceptions.RequestException:
+            if entry is not None:
+                # Backend caído o circuito abierto: se muestra la última copia
+                motos_html = entry.body
+                flash("No se pudo conectar al backend. Mostrando los últimos datos disponibles.", "warning")
+            else:
+                motos_html = "<p>No se pudo conectar al backend.</p>"
+                flash("No se pudo conectar al backend.", "danger")
+
+    if motos_html is not None and not isinstance(motos_html, str):
+        # Los mensajes flash se leen antes de empezar a enviar la respuesta:
+        # la sesión se guarda antes de recorrer el cuerpo del stream
+        get_flashed_messages(with_categories=True)
+        return Response(_coalesce(stream_template("users.html", email=session["email"],
+                                                  motos_chunks=motos_html)))
+    return render_template("users.html", email=session["email"], motos_html=motos_html)
 
+def _paged_dashboard(token):
+    key = cache_key(token)
     try:
-        response = requests.get(f"{BACKEND_URL}/motorcycles/tabla", headers=headers)
-        if response.status_code == 200:
-            motos_html = response.text
-        elif response.status_code == 401:
-            flash("Token inválido o expirado. Inicia sesión nuevamente.", "danger")
-            return redirect(url_for("logout"))
+        status = motos_index.refresh(key, lambda: fetch_motos_html(token))
+    except requests.exceptions.RequestException:
+        status = None
+        if motos_index.loaded and motos_index.is_authorized(key):
+            flash("No se pudo conectar al backend. Mostrando los últimos datos disponibles.", "warning")
         else:
-            motos_html = "<p>Error al cargar las motos.</p>"
-            flash("Error al cargar las motos.", "danger")
+            flash("No se pudo conectar al backend.", "danger")
+
+    if status == 401:
+        flash("Token inválido o expirado. Inicia sesión nuevamente.", "danger")
+        return redirect(url_for("logout"))
+    elif status is not None and status != 200:
+        flash("Error al cargar las motos.", "danger")
+
+    # El índice es compartido: solo se muestra a tokens que el backend aceptó
+    motos_page = None
+    if motos_index.loaded and motos_index.is_authorized(key):
+        motos_page = motos_index.query(**_motos_query_args())
+    return render_template("users.html", email=session["email"], motos_page=motos_page,
+                           page_endpoint="dashboard")
+
+# ----------------------------------------
+# API de motos: páginas filtradas y ordenadas del índice local
+# ----------------------------------------
+def _motos_query_args():
+    # Cualquier parámetro que no sea de control se toma como filtro por columna
+    reserved = {"page", "per_page", "sort", "order", "q", "format"}
+    return {
+        "page": request.args.get("page", 1, type=int),
+        "per_page": request.args.get("per_page", MOTOS_PER_PAGE, type=int),
+        "sort": request.args.get("sort"),
+        "order": request.args.get("order", "asc"),
+        "q": request.args.get("q"),
+        "filters": {k: v for k, v in request.args.items() if k not in reserved},
+    }
+
+
+@app.route("/api/motorcycles")
+def api_motorcycles():
+    if "email" not in session or "token" not in session:
+        return jsonify(error="Debes iniciar sesión."), 401
+
+    token = session["token"]
+    key = cache_key(token)
+    try:
+        # El índice es compartido: cada token se valida con el backend antes
+        status = motos_index.refresh(key, lambda: fetch_motos_html(token))
     except requests.exceptions.RequestException:
-        motos_html = "<p>No se pudo conectar al backend.</p>"
-        flash("No se pudo conectar al backend.", "danger")
+        status = None
 
-    return render_template("users.html", email=session["email"], motos_html=motos_html)
+    if status == 401:
+        return jsonify(error="Token inválido o expirado."), 401
+    if not motos_index.loaded or not motos_index.is_authorized(key):
+        if status is None:
+            return jsonify(error="No se pudo conectar al backend."), 503
+        return jsonify(error="Error al cargar las motos."), 502
+
+    motos_page = motos_index.query(**_motos_query_args())
+    if request.args.get("format") == "html":
+        return render_template("motos_table.html", motos_page=motos_page,
+                               page_endpoint="api_motorcycles")
+    return jsonify(motos_page)
 
 # ----------------------------------------
 # Logout
 # ----------------------------------------
 @app.route("/logout")
 def logout():
+    token = session.pop("token", None)
+    if token:
+        dashboard_cache.invalidate(cache_key(token))
+        motos_index.revoke(cache_key(token))
     session.pop("email", None)
-    session.pop("token", None)
     flash("Has cerrado sesión.", "success")
     return redirect(url_for("login"))
 
 # ----------------------------------------
 # Ejecutar app
 # ----------------------------------------
+# Solo para desarrollo; en producción: gunicorn app:app (ver gunicorn.conf.py)
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=5001)
+    app.run(debug=os.getenv("FLASK_DEBUG") == "1", host="0.0.0.0",
+            port=int(os.getenv("PORT", "5001")))
@@ -0,0 +1,113 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # Brotli es opcional: sin él solo se sirve gzip
+    brotli = None
+
+# ----------------------------------------
+# Configuración del pipeline de estáticos
+# ----------------------------------------
+# "0" desactiva los nombres con hash y se sirven los estáticos como siempre
+ASSETS_PIPELINE = os.getenv("ASSETS_PIPELINE", "1") != "0"
+# Un año: los nombres con hash nunca cambian de contenido
+ASSETS_MAX_AGE = 365 * 24 * 60 * 60
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".svg", ".html", ".json", ".txt", ".map"}
+
+
+class Asset:
+    __slots__ = ("path", "mimetype", "digest", "variants")
+
+    def __init__(self, path, data):
+        self.path = path
+        self.mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.digest = hashlib.sha256(data).hexdigest()[:12]
+        # Codificación -> bytes; "identity" siempre está
+        self.variants = {"identity": data}
+        if os.path.splitext(path)[1] in COMPRESSIBLE_EXTENSIONS:
+            if brotli is not None:
+                self._add_variant("br", brotli.compress(data, quality=11))
+            self._add_variant("gzip", gzip.compress(data, compresslevel=9, mtime=0))
+
+    def _add_variant(self, encoding, data):
+        if len(data) < len(self.variants["identity"]):
+            self.variants[encoding] = data
+
+    @property
+    def hashed_path(self):
+        root, ext = os.path.splitext(self.path)
+        return f"{root}.{self.digest}{ext}"
+
+
+class AssetManifest:
+    """Estáticos con hash de contenido, precomprimidos al arrancar.
+
+    ``url_for('static', filename=...)`` devuelve el nombre con hash y la
+    vista ``static`` lo sirve desde memoria en la mejor codificación que
+    acepte el navegador, con caché inmutable de un año.
+    """
+
+    def __init__(self):
+        self.assets = {}
+        self.hashed = {}
+
+    def build(self, static_folder):
+        assets, hashed = {}, {}
+        for root, _, files in os.walk(static_folder):
+            for name in files:
+                full_path = os.path.join(root, name)
+                path = os.path.relpath(full_path, static_folder).replace(os.sep, "/")
+                with open(full_path, "rb") as fh:
+                    asset = Asset(path, fh.read())
+                assets[path] = asset
+                hashed[asset.hashed_path] = asset
+        self.assets, self.hashed = assets, hashed
+
+    def url_defaults(self, endpoint, values):
+        if endpoint == "static":
+            asset = self.assets.get(values.get("filename"))
+            if asset is not None:
+                values["filename"] = asset.hashed_path
+
+    def serve(self, filename, fallback):
+        asset = self.hashed.get(filename)
+        if asset is None:
+            # Nombre sin hash (enlaces viejos o archivos nuevos): ruta normal
+            return fallback(filename)
+
+        encoding = _negotiate(asset.variants)
+        response = Response(asset.variants[encoding], mimetype=asset.mimetype)
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+        response.headers["Vary"] = "Accept-Encoding"
+        response.cache_control.public = True
+        response.cache_control.max_age = ASSETS_MAX_AGE
+        response.cache_control.immutable = True
+        response.set_etag(f"{asset.digest}-{encoding}")
+        return response.make_conditional(request)
+
+
+def _negotiate(variants):
+    accepted = request.accept_encodings
+    best, best_quality = "identity", 0
+    for encoding in ("br", "gzip"):
+        quality = accepted[encoding]
+        if encoding in variants and quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def init_app(app):
+    if not ASSETS_PIPELINE:
+        return None
+    manifest = AssetManifest()
+    manifest.build(app.static_folder)
+    app.url_defaults(manifest.url_defaults)
+    app.view_functions["static"] = lambda filename: manifest.serve(filename, app.send_static_file)
+    app.extensions["assets"] = manifest
+    return manifest
@@ -0,0 +1,149 @@
+import logging
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from circuit import CIRCUIT_PROBE_PATH, CircuitBreaker
+from metrics import record_backend_call
+
+# ----------------------------------------
+# Configuración del cliente del backend
+# ----------------------------------------
+# URL del backend desplegado en Railway
+BACKEND_URL = os.getenv("BACKEND_URL", "https://motosapi-production.up.railway.app")
+
+# Tamaño del pool de conexiones por worker; con gunicorn.conf.py por
+# defecto es igual a la cantidad de hilos del worker
+BACKEND_POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", "10"))
+# Timeouts en segundos: (conexión, lectura)
+BACKEND_CONNECT_TIMEOUT = float(os.getenv("BACKEND_CONNECT_TIMEOUT", "3.05"))
+BACKEND_READ_TIMEOUT = float(os.getenv("BACKEND_READ_TIMEOUT", "10"))
+# Keep-alive: si es "0" se cierra la conexión después de cada petición
+BACKEND_KEEPALIVE = os.getenv("BACKEND_KEEPALIVE", "1") != "0"
+# Reintentos solo de conexión (ver _build_session)
+BACKEND_RETRIES = int(os.getenv("BACKEND_RETRIES", "2"))
+BACKEND_RETRY_BACKOFF = float(os.getenv("BACKEND_RETRY_BACKOFF", "0.2"))
+
+logger = logging.getLogger("frontend")
+
+
+class BackendClient:
+    """Cliente HTTP compartido con pool de conexiones hacia el backend.
+
+    Cada proceso mantiene su propia ``requests.Session``: si gunicorn hace
+    fork después de crearla, el hijo detecta el cambio de PID y abre un
+    pool nuevo en lugar de reutilizar sockets heredados del padre.
+
+    Todas las llamadas pasan por un circuit breaker: con el backend caído
+    se lanza ``CircuitOpenError`` al instante en lugar de esperar un
+    intento de conexión completo.
+    """
+
+    def __init__(self, base_url=BACKEND_URL, pool_size=BACKEND_POOL_SIZE,
+                 connect_timeout=BACKEND_CONNECT_TIMEOUT, read_timeout=BACKEND_READ_TIMEOUT,
+                 keepalive=BACKEND_KEEPALIVE, retries=BACKEND_RETRIES,
+                 retry_backoff=BACKEND_RETRY_BACKOFF, probe_path=CIRCUIT_PROBE_PATH):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.keepalive = keepalive
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self._lock = threading.Lock()
+        self._session = None
+        self._pid = None
+        self.probe_path = probe_path
+        self.breaker = CircuitBreaker(probe=self._probe)
+
+    def _build_session(self):
+        # Solo se reintentan los fallos de conexión. urllib3 los reintenta
+        # para cualquier método (también POST), porque la petición nunca llegó
+        # al backend. No se reintentan timeouts de lectura ni respuestas 5xx:
+        # cada intento podría costar un read timeout completo. Peor caso por
+        # llamada: (retries + 1) * connect + read + backoff, unos 20 s con
+        # los valores por defecto, por debajo del timeout de gunicorn (30 s).
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=self.retry_backoff,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size,
+                              max_retries=retry, pool_block=False)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not self.keepalive:
+            session.headers["Connection"] = "close"
+        return session
+
+    @property
+    def session(self):
+        pid = os.getpid()
+        if self._session is None or self._pid != pid:
+            with self._lock:
+                if self._session is None or self._pid != pid:
+                    # Tras un fork no se cierra la sesión heredada: sus sockets
+                    # pertenecen al proceso padre.
+                    self._session = self._build_session()
+                    self._pid = pid
+        return self._session
+
+    def url(self, path):
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        try:
+            trial = self.breaker.before_call()
+        except requests.exceptions.RequestException as exc:
+            record_backend_call(method, path, 0.0, error=type(exc).__name__)
+            raise
+        start = time.monotonic()
+        try:
+            response = self.session.request(method, self.url(path), **kwargs)
+        except requests.exceptions.RequestException as exc:
+            elapsed = time.monotonic() - start
+            self.breaker.record_failure(elapsed, trial)
+            record_backend_call(method, path, elapsed, error=type(exc).__name__)
+            logger.error("Error conectando con el backend: %s %s: %s", method, path, exc)
+            raise
+        elapsed = time.monotonic() - start
+        if response.status_code >= 500:
+            self.breaker.record_failure(elapsed, trial)
+        else:
+            self.breaker.record_success(elapsed, trial)
+        record_backend_call(method, path, elapsed, status=response.status_code)
+        logger.info("%s %s -> %s (%.1f ms)", method, path, response.status_code, elapsed * 1000)
+        return response
+
+    def _probe(self):
+        # Cualquier respuesta que no sea un error del servidor indica que
+        # el backend vuelve a aceptar conexiones
+        response = self.session.get(self.url(self.probe_path), timeout=self.timeout,
+                                    allow_redirects=False)
+        return response.status_code < 500
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def close(self):
+        with self._lock:
+            if self._session is not None and self._pid == os.getpid():
+                self._session.close()
+            self._session = None
+            self._pid = None
+
+
+# Cliente único usado por todas las vistas
+backend = BackendClient()
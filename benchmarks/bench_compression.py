@@ -0,0 +1,101 @@
+"""Ahorro de bytes y costo de CPU de la compresión del dashboard.
+
+Arma una página ``users.html`` con una tabla sintética de motos (con la
+indentación típica de una plantilla Jinja) y mide cada combinación de
+minificado y compresión.
+
+    python benchmarks/bench_compression.py --rows 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import render_template  # noqa: E402
+
+from app import app  # noqa: E402
+from compression import brotli, compress, minify_html  # noqa: E402
+
+MARCAS = ("Honda", "Yamaha", "Suzuki", "Kawasaki", "Ducati", "BMW", "KTM", "Triumph")
+
+
+def synthetic_table(rows):
+    lines = [
+        '<table class="table table-striped">',
+        "    <thead>",
+        "        <tr>",
+        "            <th>ID</th>",
+        "            <th>Marca</th>",
+        "            <th>Modelo</th>",
+        "            <th>Año</th>",
+        "            <th>Cilindrada</th>",
+        "            <th>Precio</th>",
+        "        </tr>",
+        "    </thead>",
+        "    <tbody>",
+    ]
+    for i in range(rows):
+        lines += [
+            "        <tr>",
+            f"            <td>{i + 1}</td>",
+            f"            <td>{MARCAS[i % len(MARCAS)]}</td>",
+            f"            <td>Modelo {i * 7 % 997}</td>",
+            f"            <td>{1995 + i % 30}</td>",
+            f"            <td>{(125, 250, 400, 650, 900, 1200)[i % 6]} cc</td>",
+            f"            <td>${4500 + (i * 37) % 20000}</td>",
+            "        </tr>",
+        ]
+    lines += ["    </tbody>", "</table>"]
+    return "\n".join(lines)
+
+
+def render_page(rows):
+    with app.test_request_context("/dashboard"):
+        return render_template("users.html", email="bench@motos.app", motos_html=synthetic_table(rows))
+
+
+def measure(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    page = render_page(args.rows)
+    raw = page.encode("utf-8")
+    minified, minify_time = measure(lambda: minify_html(page).encode("utf-8"), args.repeat)
+
+    cases = [("identity", None, None)]
+    cases += [("gzip", "gzip", level) for level in (1, 6, 9)]
+    if brotli is not None:
+        cases += [("br", "br", quality) for quality in (1, 4, 5, 11)]
+
+    print(f"Tabla sintética: {args.rows} filas, página de {len(raw):,} bytes")
+    print(f"Minificado: {len(raw):,} -> {len(minified):,} bytes en {minify_time * 1000:.1f} ms\n")
+    print(f"{'codificación':<14}{'nivel':>6}{'bytes':>12}{'ratio':>8}{'ms':>9}"
+          f"{'bytes+min':>12}{'ms+min':>9}")
+    for name, encoding, level in cases:
+        if encoding is None:
+            plain, plain_time = raw, 0.0
+            small, small_time = minified, 0.0
+        else:
+            plain, plain_time = measure(lambda: compress(raw, encoding, level), args.repeat)
+            small, small_time = measure(lambda: compress(minified, encoding, level), args.repeat)
+        print(f"{name:<14}{'' if level is None else level:>6}{len(plain):>12,}"
+              f"{len(plain) / len(raw):>8.3f}{plain_time * 1000:>9.1f}"
+              f"{len(small):>12,}{(small_time + minify_time) * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
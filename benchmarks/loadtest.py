@@ -0,0 +1,219 @@
+"""Prueba de carga de ``/login`` y ``/dashboard`` con concurrencia fija.
+
+Con ``--spawn`` levanta el backend de prueba (``stub_backend.py``) y el
+frontend con gunicorn.conf.py en puertos libres; si no, apunta a un
+frontend ya en marcha con ``--frontend``. Reporta throughput y latencias
+p50/p95/p99 por escenario.
+
+    python benchmarks/loadtest.py --spawn --concurrency 16 --duration 10 --rows 2000
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url, timeout=1, allow_redirects=False)
+            return
+        except requests.exceptions.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} no respondió en {timeout:.0f} s")
+
+
+def spawn(args):
+    """Arranca backend de prueba y frontend; devuelve (url, procesos)."""
+    backend_port, frontend_port = free_port(), free_port()
+    backend = subprocess.Popen(
+        [sys.executable, os.path.join(BENCH_DIR, "stub_backend.py"), "--port", str(backend_port),
+         "--latency", str(args.latency), "--jitter", str(args.jitter),
+         "--failure-rate", str(args.failure_rate), "--rows", str(args.rows)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    env = dict(os.environ, BACKEND_URL=f"http://127.0.0.1:{backend_port}",
+               GUNICORN_BIND=f"127.0.0.1:{frontend_port}", PORT=str(frontend_port),
+               LOG_LEVEL="WARNING")
+    env.update(item.split("=", 1) for item in args.env)
+    frontend = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    processes = [frontend, backend]
+    try:
+        wait_until_up(f"http://127.0.0.1:{backend_port}/")
+        wait_until_up(f"http://127.0.0.1:{frontend_port}/login")
+    except RuntimeError:
+        stop(processes)
+        raise
+    return f"http://127.0.0.1:{frontend_port}", processes
+
+
+def stop(processes):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def login(session, frontend, user):
+    return session.post(f"{frontend}/login", data={"email": f"bench{user}@motos.app", "password": "bench"},
+                        allow_redirects=False, timeout=30)
+
+
+def run_scenario(name, frontend, concurrency, duration):
+    """Cada usuario virtual repite su petición hasta que se acaba el tiempo."""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = [0.0]
+
+    def start_clock():
+        # Corre una vez, cuando todos los usuarios ya iniciaron sesión
+        deadline[0] = time.monotonic() + duration
+
+    # El timeout corta la prueba si algún usuario nunca llega a empezar
+    start_barrier = threading.Barrier(concurrency + 1, action=start_clock, timeout=60)
+
+    def user(user_id):
+        session = requests.Session()
+        if name == "dashboard":
+            # Un login fallido cuenta como error, pero el usuario igual llega
+            # a la barrera: si no, los demás hilos esperarían para siempre
+            try:
+                logged_in = login(session, frontend, user_id).status_code == 302
+            except requests.exceptions.RequestException:
+                logged_in = False
+            if not logged_in:
+                with lock:
+                    errors[0] += 1
+        try:
+            start_barrier.wait()
+        except threading.BrokenBarrierError:
+            return
+        local, failed = [], 0
+        while time.monotonic() < deadline[0]:
+            start = time.perf_counter()
+            try:
+                if name == "login":
+                    # Sesión nueva en cada login: siempre llega al backend
+                    session.cookies.clear()
+                    response = login(session, frontend, user_id)
+                    ok = response.status_code == 302 and "/dashboard" in response.headers.get("Location", "")
+                else:
+                    response = session.get(f"{frontend}/dashboard", allow_redirects=False, timeout=30)
+                    ok = response.status_code == 200
+            except requests.exceptions.RequestException:
+                ok = False
+            local.append(time.perf_counter() - start)
+            failed += not ok
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    try:
+        start_barrier.wait()
+    except threading.BrokenBarrierError:
+        start_barrier.abort()
+        for thread in threads:
+            thread.join()
+        raise RuntimeError(f"{name}: no todos los usuarios llegaron a empezar la prueba")
+    began = time.monotonic()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - began
+    return summarize(name, latencies, errors[0], elapsed, concurrency)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(name, latencies, errors, elapsed, concurrency):
+    values = sorted(latencies)
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "requests": len(values),
+        "errors": errors,
+        "throughput": len(values) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(values, 0.50) * 1000,
+        "p95_ms": percentile(values, 0.95) * 1000,
+        "p99_ms": percentile(values, 0.99) * 1000,
+        "max_ms": (values[-1] if values else 0.0) * 1000,
+    }
+
+
+def print_report(results):
+    print(f"{'escenario':<12}{'conc':>6}{'req':>8}{'err':>6}{'req/s':>10}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for r in results:
+        print(f"{r['scenario']:<12}{r['concurrency']:>6}{r['requests']:>8}{r['errors']:>6}"
+              f"{r['throughput']:>10.1f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+              f"{r['p99_ms']:>10.1f}{r['max_ms']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frontend", default="http://127.0.0.1:5001",
+                        help="URL de un frontend ya en marcha (sin --spawn)")
+    parser.add_argument("--spawn", action="store_true",
+                        help="levantar backend de prueba y frontend con gunicorn")
+    parser.add_argument("--scenario", choices=("login", "dashboard", "all"), default="all")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos por escenario")
+    parser.add_argument("--warmup", type=float, default=2.0, help="segundos de calentamiento")
+    parser.add_argument("--latency", type=float, default=0.05, help="latencia del backend de prueba")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--env", action="append", default=[], metavar="CLAVE=VALOR",
+                        help="variable de entorno extra para el frontend (con --spawn)")
+    parser.add_argument("--json", action="store_true", help="imprimir resultados como JSON")
+    args = parser.parse_args()
+
+    processes = []
+    frontend = args.frontend.rstrip("/")
+    if args.spawn:
+        frontend, processes = spawn(args)
+    try:
+        scenarios = ("login", "dashboard") if args.scenario == "all" else (args.scenario,)
+        results = []
+        for name in scenarios:
+            if args.warmup:
+                run_scenario(name, frontend, args.concurrency, args.warmup)
+            results.append(run_scenario(name, frontend, args.concurrency, args.duration))
+    finally:
+        stop(processes)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Backend de prueba que imita a MotosAPI para los benchmarks.
+
+Responde ``/login``, ``/register`` y ``/motorcycles/tabla`` con latencia,
+tasa de fallos y tamaño de tabla configurables, sin tocar el backend real
+de Railway.
+
+    python benchmarks/stub_backend.py --port 5055 --latency 0.05 --rows 2000
+"""
+import argparse
+import hashlib
+import random
+import secrets
+import threading
+import time
+
+from flask import Flask, jsonify, request
+from werkzeug.serving import run_simple
+
+MARCAS = ("Honda", "Yamaha", "Suzuki", "Kawasaki", "Ducati", "BMW", "KTM", "Triumph")
+
+
+def build_table(rows):
+    parts = ['<table class="table table-striped"><thead><tr><th>ID</th><th>Marca</th>'
+             "<th>Modelo</th><th>Año</th><th>Cilindrada</th></tr></thead><tbody>"]
+    for i in range(rows):
+        parts.append(f"<tr><td>{i + 1}</td><td>{MARCAS[i % len(MARCAS)]}</td>"
+                     f"<td>Modelo {i * 7 % 997}</td><td>{1995 + i % 30}</td>"
+                     f"<td>{(125, 250, 400, 650, 900, 1200)[i % 6]} cc</td></tr>")
+    parts.append("</tbody></table>")
+    return "".join(parts)
+
+
+def create_app(latency=0.0, jitter=0.0, failure_rate=0.0, rows=500):
+    app = Flask(__name__)
+    table = build_table(rows)
+    etag = '"' + hashlib.sha256(table.encode("utf-8")).hexdigest()[:16] + '"'
+    users = {}
+    tokens = set()
+    lock = threading.Lock()
+
+    def simulate():
+        # Devuelve una respuesta de error si toca fallar
+        if latency or jitter:
+            time.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+        if failure_rate and random.random() < failure_rate:
+            return jsonify(error="Fallo simulado"), 503
+        return None
+
+    @app.route("/")
+    def health():
+        return "ok"
+
+    @app.route("/register", methods=["POST"])
+    def register():
+        failure = simulate()
+        if failure:
+            return failure
+        data = request.get_json(silent=True) or {}
+        with lock:
+            if data.get("email") in users:
+                return jsonify(error="Ya existe"), 409
+            users[data.get("email")] = data.get("password")
+        return jsonify(ok=True), 201
+
+    @app.route("/login", methods=["POST"])
+    def login():
+        failure = simulate()
+        if failure:
+            return failure
+        data = request.get_json(silent=True) or {}
+        if not data.get("email") or not data.get("password"):
+            return jsonify(error="Credenciales incorrectas"), 401
+        # Cualquier usuario entra: el benchmark no necesita registrarse antes
+        token = secrets.token_hex(16)
+        with lock:
+            tokens.add(token)
+        return jsonify(token=token)
+
+    @app.route("/motorcycles/tabla")
+    def tabla():
+        failure = simulate()
+        if failure:
+            return failure
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if token not in tokens:
+            return jsonify(error="Token inválido"), 401
+        if request.headers.get("If-None-Match") == etag:
+            return "", 304, {"ETag": etag}
+        return table, 200, {"Content-Type": "text/html; charset=utf-8", "ETag": etag}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--latency", type=float, default=0.0, help="segundos por petición")
+    parser.add_argument("--jitter", type=float, default=0.0, help="± segundos aleatorios")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="proporción de 503")
+    parser.add_argument("--rows", type=int, default=500, help="filas de la tabla")
+    args = parser.parse_args()
+
+    app = create_app(args.latency, args.jitter, args.failure_rate, args.rows)
+    run_simple(args.host, args.port, app, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# ----------------------------------------
+# Configuración de la caché del dashboard
+# ----------------------------------------
+# Segundos en los que una entrada se sirve sin consultar al backend
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "30"))
+# Segundos adicionales en los que una entrada vencida se sirve mientras se
+# refresca en segundo plano (stale-while-revalidate). 0 lo desactiva.
+DASHBOARD_CACHE_STALE = float(os.getenv("DASHBOARD_CACHE_STALE", "300"))
+# Límite de memoria total y por entrada, en bytes
+DASHBOARD_CACHE_MAX_BYTES = int(os.getenv("DASHBOARD_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+DASHBOARD_CACHE_MAX_ENTRY_BYTES = int(os.getenv("DASHBOARD_CACHE_MAX_ENTRY_BYTES", str(4 * 1024 * 1024)))
+
+
+def cache_key(token):
+    # No se guarda el token en claro como clave
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class CacheEntry:
+    __slots__ = ("body", "etag", "last_modified", "stored_at", "size")
+
+    def __init__(self, body, etag=None, last_modified=None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = time.monotonic()
+        self.size = len(body.encode("utf-8"))
+
+    def age(self):
+        return time.monotonic() - self.stored_at
+
+    def validators(self):
+        # Cabeceras para una petición condicional al backend
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class FragmentCache:
+    """Caché LRU acotada por bytes para fragmentos HTML del backend."""
+
+    def __init__(self, ttl=DASHBOARD_CACHE_TTL, stale=DASHBOARD_CACHE_STALE,
+                 max_bytes=DASHBOARD_CACHE_MAX_BYTES, max_entry_bytes=DASHBOARD_CACHE_MAX_ENTRY_BYTES):
+        self.ttl = ttl
+        self.stale = stale
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            # Las entradas muy viejas se devuelven igual: sus validadores
+            # permiten una revalidación condicional con el backend
+            self._entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry):
+        return entry.age() <= self.ttl
+
+    def is_servable_stale(self, entry):
+        return self.stale > 0 and entry.age() <= self.ttl + self.stale
+
+    def put(self, key, body, etag=None, last_modified=None):
+        entry = CacheEntry(body, etag, last_modified)
+        with self._lock:
+            self._discard(key)
+            if entry.size > self.max_entry_bytes:
+                return entry
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+        return entry
+
+    def touch(self, key):
+        # El backend respondió 304: la copia sigue vigente
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stored_at = time.monotonic()
+                self._entries.move_to_end(key)
+            return entry
+
+    def invalidate(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def refresh_in_background(self, key, refresh):
+        # Un solo refresco en curso por clave
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                refresh()
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name="dashboard-cache-refresh", daemon=True).start()
+        return True
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Caché compartida del fragmento /motorcycles/tabla
+dashboard_cache = FragmentCache()
@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from collections import deque
+
+import requests
+
+# ----------------------------------------
+# Configuración del circuit breaker
+# ----------------------------------------
+# Número de llamadas recientes que se evalúan
+CIRCUIT_WINDOW = int(os.getenv("CIRCUIT_WINDOW", "20"))
+# Mínimo de llamadas en la ventana antes de poder abrir el circuito
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))
+# Proporción de fallos que abre el circuito
+CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+# Una llamada más lenta que esto (segundos) cuenta como lenta
+CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "5"))
+# Proporción de llamadas lentas que abre el circuito
+CIRCUIT_SLOW_CALL_RATE = float(os.getenv("CIRCUIT_SLOW_CALL_RATE", "0.8"))
+# Segundos que el circuito permanece abierto antes de pasar a semiabierto
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "15"))
+# Llamadas de prueba simultáneas permitidas en estado semiabierto
+CIRCUIT_HALF_OPEN_CALLS = int(os.getenv("CIRCUIT_HALF_OPEN_CALLS", "1"))
+# Sonda de salud en segundo plano mientras el circuito está abierto
+CIRCUIT_PROBE_PATH = os.getenv("CIRCUIT_PROBE_PATH", "/")
+CIRCUIT_PROBE_INTERVAL = float(os.getenv("CIRCUIT_PROBE_INTERVAL", "5"))
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """El circuito está abierto: la llamada se rechaza sin tocar la red.
+
+    Hereda de ``ConnectionError`` para que las vistas la traten igual que
+    un backend caído.
+    """
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, window=CIRCUIT_WINDOW, min_calls=CIRCUIT_MIN_CALLS,
+                 failure_rate=CIRCUIT_FAILURE_RATE, slow_call_seconds=CIRCUIT_SLOW_CALL_SECONDS,
+                 slow_call_rate=CIRCUIT_SLOW_CALL_RATE, open_seconds=CIRCUIT_OPEN_SECONDS,
+                 half_open_calls=CIRCUIT_HALF_OPEN_CALLS, probe=None,
+                 probe_interval=CIRCUIT_PROBE_INTERVAL):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.probe = probe
+        self.probe_interval = probe_interval
+        self._outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+        self._half_open_round = 0
+        self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def before_call(self):
+        """Reserva un turno para llamar al backend o lanza ``CircuitOpenError``.
+
+        Devuelve un identificador de prueba si la llamada es una de las
+        pruebas del estado semiabierto, o ``None`` si es una llamada normal.
+        Hay que pasarlo a ``record_success``/``record_failure``.
+        """
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.OPEN:
+                raise CircuitOpenError("Circuito abierto: backend no disponible")
+            if self._state == self.HALF_OPEN:
+                if self._trials >= self.half_open_calls:
+                    raise CircuitOpenError("Circuito semiabierto: prueba en curso")
+                self._trials += 1
+                return self._half_open_round
+            return None
+
+    def record_success(self, latency, trial=None):
+        with self._lock:
+            if self._state != self.CLOSED:
+                # Solo una prueba de esta ronda semiabierta puede cerrar el
+                # circuito; las llamadas que empezaron antes no cuentan
+                if self._is_current_trial(trial):
+                    self._close()
+                return
+            self._outcomes.append((True, latency >= self.slow_call_seconds))
+            self._evaluate()
+
+    def record_failure(self, latency=0.0, trial=None):
+        with self._lock:
+            if self._state != self.CLOSED:
+                if self._is_current_trial(trial):
+                    self._open()
+                return
+            self._outcomes.append((False, latency >= self.slow_call_seconds))
+            self._evaluate()
+
+    def _is_current_trial(self, trial):
+        return (trial is not None and self._state == self.HALF_OPEN
+                and trial == self._half_open_round)
+
+    def _evaluate(self):
+        if self._state != self.CLOSED:
+            return
+        total = len(self._outcomes)
+        if total < self.min_calls:
+            return
+        failures = sum(1 for ok, _ in self._outcomes if not ok)
+        slow = sum(1 for _, is_slow in self._outcomes if is_slow)
+        if failures / total >= self.failure_rate or slow / total >= self.slow_call_rate:
+            self._open()
+
+    def _maybe_half_open(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._half_open()
+
+    def _half_open(self):
+        self._state = self.HALF_OPEN
+        self._trials = 0
+        self._half_open_round += 1
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._trials = 0
+        self._outcomes.clear()
+        self._start_probe()
+
+    def _start_probe(self):
+        if self.probe is not None and not self._probing:
+            self._probing = True
+            threading.Thread(target=self._run_probe, name="circuit-probe", daemon=True).start()
+
+    def _close(self):
+        self._state = self.CLOSED
+        self._trials = 0
+        self._outcomes.clear()
+
+    def _run_probe(self):
+        try:
+            while True:
+                time.sleep(self.probe_interval)
+                with self._lock:
+                    if self._state != self.OPEN:
+                        return
+                try:
+                    healthy = self.probe()
+                except Exception:
+                    healthy = False
+                if healthy:
+                    # El backend responde: se deja pasar tráfico de prueba
+                    with self._lock:
+                        if self._state == self.OPEN:
+                            self._half_open()
+                    return
+        finally:
+            with self._lock:
+                self._probing = False
+                # El circuito pudo volver a abrirse mientras la sonda terminaba
+                if self._state == self.OPEN:
+                    self._start_probe()
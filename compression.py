@@ -0,0 +1,265 @@
+import os
+import re
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Brotli es opcional: sin él solo se usa gzip
+    brotli = None
+
+# ----------------------------------------
+# Configuración de la compresión de respuestas
+# ----------------------------------------
+# Respuestas con Content-Length menor a esto se envían sin comprimir
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "500"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "5"))
+# "1" colapsa los espacios del HTML antes de comprimir
+HTML_MINIFY = os.getenv("HTML_MINIFY", "0") == "1"
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+
+# Bloques cuyo contenido no se toca al minificar
+_PRESERVED = re.compile(r"(<(pre|script|style|textarea)\b.*?</\2\s*>)", re.IGNORECASE | re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+# Etiquetas de apertura o cierre, con atributos entre comillas que pueden tener ">"
+_TAG = re.compile(r"""</?[a-zA-Z](?:[^>"']|"[^"]*"|'[^']*')*>""")
+_QUOTED = re.compile(r"""("[^"]*"|'[^']*')""")
+
+
+def minify_html(html):
+    """Colapsa los espacios en blanco fuera de ``<pre>``, ``<script>``,
+    ``<style>`` y ``<textarea>``.
+
+    Cada tramo de espacios queda como un salto de línea (si lo tenía) o un
+    espacio, así que el documento se ve igual en el navegador. Los valores
+    de atributos entre comillas se copian tal cual.
+    """
+    parts = _PRESERVED.split(html)
+    out = []
+    # split devuelve [texto, bloque, nombre_tag, texto, bloque, nombre_tag, ...]
+    for i in range(0, len(parts), 3):
+        _minify_text(parts[i], out)
+        if i + 1 < len(parts):
+            out.append(parts[i + 1])
+    return "".join(out)
+
+
+def _minify_text(text, out):
+    position = 0
+    for tag in _TAG.finditer(text):
+        out.append(_WHITESPACE.sub(_collapse, text[position:tag.start()]))
+        # split devuelve [fuera, "entre comillas", fuera, ...]
+        for j, piece in enumerate(_QUOTED.split(tag.group(0))):
+            out.append(piece if j % 2 else _WHITESPACE.sub(_collapse, piece))
+        position = tag.end()
+    out.append(_WHITESPACE.sub(_collapse, text[position:]))
+
+
+def _collapse(match):
+    return "\n" if "\n" in match.group(0) else " "
+
+
+def negotiate(accept_encoding):
+    """Elige ``"br"``, ``"gzip"`` o ``None`` según el Accept-Encoding."""
+    qualities = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            qualities[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding, level=None):
+    if encoding == "br":
+        quality = COMPRESS_BROTLI_QUALITY if level is None else level
+        return brotli.compress(data, quality=quality)
+    compressor = zlib.compressobj(COMPRESS_GZIP_LEVEL if level is None else level,
+                                  zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+class _StreamCompressor:
+    """Comprime por trozos y vacía el compresor en cada uno para no
+    retrasar lo que ya se puede enviar al navegador."""
+
+    def __init__(self, encoding, gzip_level, brotli_quality):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def chunk(self, data):
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """Middleware WSGI que comprime con brotli o gzip según el navegador.
+
+    Las respuestas con Content-Length se comprimen de una vez (y se
+    minifican si es HTML y ``minify`` está activo) solo si superan
+    ``min_size``. Las respuestas en stream no tienen tamaño conocido: se
+    comprimen trozo a trozo y no se minifican.
+    """
+
+    def __init__(self, app, min_size=COMPRESS_MIN_SIZE, gzip_level=COMPRESS_GZIP_LEVEL,
+                 brotli_quality=COMPRESS_BROTLI_QUALITY, minify=HTML_MINIFY):
+        self.app = app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.minify = minify
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") == "HEAD":
+            return self.app(environ, start_response)
+        encoding = negotiate(environ.get("HTTP_ACCEPT_ENCODING", ""))
+
+        state = {}
+
+        def capture(status, headers, exc_info=None):
+            state["status"], state["headers"], state["exc_info"] = status, headers, exc_info
+            # write() heredado de WSGI: se acumula y se antepone al cuerpo
+            return state.setdefault("written", []).append
+
+        app_iter = self.app(environ, capture)
+        status, headers = state["status"], state["headers"]
+        written = state.get("written", [])
+        if not self._compressible(status, headers):
+            start_response(status, headers, state["exc_info"])
+            return _chain(written, app_iter)
+
+        headers = [(k, v) for k, v in headers if k.lower() != "vary"] + \
+            [("Vary", _vary(headers))]
+        length = _header(headers, "content-length")
+        if length is not None:
+            return self._buffered(status, headers, written, app_iter, encoding, start_response)
+        if encoding is None:
+            start_response(status, headers, state["exc_info"])
+            return _chain(written, app_iter)
+
+        headers = _encoded([(k, v) for k, v in headers if k.lower() != "content-length"], encoding)
+        start_response(status, headers, state["exc_info"])
+        return self._streamed(written, app_iter, encoding)
+
+    def _compressible(self, status, headers):
+        if status[:3] in ("204", "304") or _header(headers, "content-encoding"):
+            return False
+        # Content-Range describe bytes sin comprimir: un rango comprimido
+        # no se puede unir con los demás
+        if status[:3] == "206" or _header(headers, "content-range"):
+            return False
+        if "no-transform" in (_header(headers, "cache-control") or ""):
+            return False
+        content_type = (_header(headers, "content-type") or "").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _buffered(self, status, headers, written, app_iter, encoding, start_response):
+        try:
+            body = b"".join(_chain(written, app_iter))
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+
+        content_type = (_header(headers, "content-type") or "").lower()
+        if self.minify and content_type.startswith("text/html"):
+            charset = _charset(content_type)
+            body = minify_html(body.decode(charset, "replace")).encode(charset)
+
+        headers = [(k, v) for k, v in headers if k.lower() != "content-length"]
+        if encoding is not None and len(body) >= self.min_size:
+            level = self.brotli_quality if encoding == "br" else self.gzip_level
+            body = compress(body, encoding, level)
+            headers = _encoded(headers, encoding)
+        headers.append(("Content-Length", str(len(body))))
+        start_response(status, headers)
+        return [body]
+
+    def _streamed(self, written, app_iter, encoding):
+        compressor = _StreamCompressor(encoding, self.gzip_level, self.brotli_quality)
+        try:
+            for data in _chain(written, app_iter):
+                if data:
+                    out = compressor.chunk(data)
+                    if out:
+                        yield out
+            yield compressor.finish()
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+
+
+def _chain(written, app_iter):
+    if not written:
+        return app_iter
+    return _Chained(written, app_iter)
+
+
+class _Chained:
+    # Conserva close() del iterador original, como exige WSGI
+    def __init__(self, written, app_iter):
+        self.written = written
+        self.app_iter = app_iter
+
+    def __iter__(self):
+        yield from self.written
+        yield from self.app_iter
+
+    def close(self):
+        if hasattr(self.app_iter, "close"):
+            self.app_iter.close()
+
+
+def _header(headers, name):
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _encoded(headers, encoding):
+    # La versión comprimida no es idéntica byte a byte a la original: el ETag
+    # pasa a ser débil (sigue sirviendo para If-None-Match) y no se ofrecen
+    # rangos, que se calcularían sobre el cuerpo sin comprimir
+    headers = [(k, "W/" + v if k.lower() == "etag" and not v.startswith("W/") else v)
+               for k, v in headers if k.lower() != "accept-ranges"]
+    headers.append(("Content-Encoding", encoding))
+    return headers
+
+
+def _vary(headers):
+    vary = _header(headers, "vary")
+    if not vary:
+        return "Accept-Encoding"
+    if "accept-encoding" in vary.lower():
+        return vary
+    return f"{vary}, Accept-Encoding"
+
+
+def _charset(content_type):
+    match = re.search(r"charset=([\w-]+)", content_type)
+    return match.group(1) if match else "utf-8"
@@ -0,0 +1,59 @@
+# ----------------------------------------
+# Perfil de producción para gunicorn
+# ----------------------------------------
+# gunicorn lo carga solo al arrancar desde este directorio:
+#     gunicorn app:app
+# Cada valor se puede sobrescribir con variables de entorno.
+import multiprocessing
+import os
+
+CORES = multiprocessing.cpu_count()
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '5001')}")
+
+# "gthread" (por defecto): un proceso por núcleo con un número fijo de
+# hilos; las vistas pasan casi todo el tiempo esperando al backend.
+# "sync": un hilo por proceso, más procesos.
+# "gevent": requiere instalar gevent.
+# Solo una de las dos dimensiones crece con los núcleos: cada proceso tiene
+# su propia caché del dashboard y cada hilo su conexión al backend.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+
+if worker_class == "sync":
+    _default_workers, _default_threads = 2 * CORES + 1, 1
+else:
+    _default_workers, _default_threads = max(2, CORES), 8
+
+workers = int(os.getenv("GUNICORN_WORKERS", str(_default_workers)))
+threads = int(os.getenv("GUNICORN_THREADS", str(_default_threads)))
+# Peticiones simultáneas por worker: hilos, o greenlets con gevent
+_concurrency = threads
+if worker_class == "gevent":
+    worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "256"))
+    _concurrency = worker_connections
+# Una conexión al backend por petición simultánea: con menos, las que no
+# encuentran una libre abren conexiones nuevas que luego se descartan.
+# Este archivo se carga antes que la app, así que backend.py ya lo ve.
+os.environ.setdefault("BACKEND_POOL_SIZE", str(_concurrency))
+
+# La app se importa una sola vez en el master: plantillas precompiladas y
+# estáticos comprimidos se comparten con los workers por copy-on-write.
+# El cliente del backend y el logging se reabren solos en cada worker.
+# Con gevent no: el worker parchea socket, ssl y threading recién después
+# del fork, y la app importada antes (requests, urllib3, locks) quedaría
+# con los módulos sin parchear.
+preload_app = worker_class != "gevent" and os.getenv("GUNICORN_PRELOAD", "1") != "0"
+
+# Las llamadas al backend tienen timeouts propios (BACKEND_*_TIMEOUT);
+# esto solo corta workers colgados.
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Reciclar workers de a poco evita que crezca la memoria indefinidamente
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+accesslog = os.getenv("GUNICORN_ACCESSLOG", None)
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOGLEVEL", "info")
@@ -0,0 +1,314 @@
+import atexit
+import hmac
+import ipaddress
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import (Response, abort, g, has_request_context, request, template_rendered,
+                   before_render_template)
+from flask.sessions import SessionInterface
+
+# ----------------------------------------
+# Configuración de métricas y logging
+# ----------------------------------------
+LOG_FILE = os.getenv("LOG_FILE", "")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# Acceso a /metrics: desde estas redes (por defecto solo la máquina local)
+# o con "Authorization: Bearer <METRICS_TOKEN>". Detrás de un proxy la
+# dirección es la del proxy: en ese caso conviene usar el token.
+METRICS_ALLOWED_NETWORKS = tuple(
+    ipaddress.ip_network(item.strip(), strict=False)
+    for item in os.getenv("METRICS_ALLOWED_NETWORKS", "127.0.0.1,::1").split(",") if item.strip())
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Límites (en segundos) de los histogramas de latencia
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger("frontend")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{_escape(value)}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels=()):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Conteos por bucket (más +Inf), suma y total
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, labels=()):
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket"
+                             f"{_format_labels(self.labelnames, labels, (('le', le),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    """Métricas del worker en formato de texto de Prometheus.
+
+    Los valores son por proceso: con varios workers de gunicorn cada uno
+    expone los suyos.
+    """
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.histogram(
+    "frontend_request_duration_seconds", "Latencia de las vistas del frontend.", ("route", "method"))
+REQUESTS = registry.counter(
+    "frontend_requests_total", "Respuestas del frontend por ruta y status.", ("route", "method", "status"))
+PHASE_LATENCY = registry.histogram(
+    "frontend_phase_duration_seconds", "Tiempo por fase: backend, render y session.", ("phase",))
+BACKEND_LATENCY = registry.histogram(
+    "frontend_backend_duration_seconds", "Latencia de las llamadas al backend.", ("method", "path"))
+BACKEND_RESPONSES = registry.counter(
+    "frontend_backend_responses_total", "Respuestas del backend por status.", ("method", "path", "status"))
+BACKEND_ERRORS = registry.counter(
+    "frontend_backend_errors_total", "Llamadas al backend que fallaron sin respuesta.", ("method", "path", "error"))
+
+
+# ----------------------------------------
+# Tiempos por fase y cabecera Server-Timing
+# ----------------------------------------
+def observe_phase(phase, seconds):
+    PHASE_LATENCY.observe((phase,), seconds)
+    # Los hilos en segundo plano no tienen petición asociada
+    if has_request_context():
+        timings = g.setdefault("_server_timing", {})
+        timings[phase] = timings.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def timed(phase):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_phase(phase, time.perf_counter() - start)
+
+
+def record_backend_call(method, path, seconds, status=None, error=None):
+    observe_phase("backend", seconds)
+    BACKEND_LATENCY.observe((method, path), seconds)
+    if error is not None:
+        BACKEND_ERRORS.inc((method, path, error))
+    else:
+        BACKEND_RESPONSES.inc((method, path, str(status)))
+
+
+def _server_timing_header(total):
+    parts = [f"{phase};dur={seconds * 1000:.1f}"
+             for phase, seconds in g.get("_server_timing", {}).items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class TimedSessionInterface(SessionInterface):
+    """Envuelve la interfaz de sesión para medir su apertura y guardado."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def open_session(self, app, request):
+        with timed("session"):
+            return self.inner.open_session(app, request)
+
+    def make_null_session(self, app):
+        return self.inner.make_null_session(app)
+
+    def is_null_session(self, obj):
+        return self.inner.is_null_session(obj)
+
+    def save_session(self, app, session, response):
+        # Se guarda después de after_request: cuenta en /metrics pero no en Server-Timing
+        with timed("session"):
+            return self.inner.save_session(app, session, response)
+
+
+# ----------------------------------------
+# Logging sin bloquear el hilo de la petición
+# ----------------------------------------
+_listener = None
+
+
+def setup_logging(log_file=LOG_FILE, level=LOG_LEVEL):
+    """Envía los registros a una cola que vacía un hilo aparte.
+
+    Los handlers reales (archivo y stderr) solo los usa el hilo del
+    ``QueueListener``; tras un fork se arranca un listener nuevo.
+    """
+    global _listener
+    if _listener is not None:
+        return logger
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+
+    def start_listener():
+        global _listener
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+    start_listener()
+    atexit.register(lambda: _listener.stop())
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=start_listener)
+    return logger
+
+
+# ----------------------------------------
+# Integración con Flask
+# ----------------------------------------
+def init_app(app):
+    setup_logging()
+    app.session_interface = TimedSessionInterface(app.session_interface)
+
+    @app.before_request
+    def _start_timer():
+        g._request_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop("_request_start", None)
+        if start is None:
+            return response
+        total = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        REQUEST_LATENCY.observe((route, request.method), total)
+        REQUESTS.inc((route, request.method, str(response.status_code)))
+        response.headers["Server-Timing"] = _server_timing_header(total)
+        return response
+
+    def _render_started(sender, template, context, **extra):
+        g._render_start = time.perf_counter()
+
+    def _render_finished(sender, template, context, **extra):
+        start = g.pop("_render_start", None)
+        if start is not None:
+            observe_phase("render", time.perf_counter() - start)
+
+    before_render_template.connect(_render_started, app, weak=False)
+    template_rendered.connect(_render_finished, app, weak=False)
+
+    @app.route("/metrics")
+    def metrics():
+        # Sin permiso se responde como si la ruta no existiera
+        if not _metrics_allowed():
+            abort(404)
+        return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+    return app
+
+
+def _metrics_allowed():
+    if METRICS_TOKEN:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if hmac.compare_digest(supplied.encode("utf-8"), METRICS_TOKEN.encode("utf-8")):
+            return True
+    try:
+        address = ipaddress.ip_address(request.remote_addr or "")
+    except ValueError:
+        return False
+    return any(address in network for network in METRICS_ALLOWED_NETWORKS)
@@ -0,0 +1,266 @@
+import hashlib
+import math
+import os
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from html.parser import HTMLParser
+
+# ----------------------------------------
+# Configuración del índice de motos
+# ----------------------------------------
+# Segundos antes de volver a pedir la tabla al backend
+MOTOS_INDEX_TTL = float(os.getenv("MOTOS_INDEX_TTL", "60"))
+MOTOS_PER_PAGE = int(os.getenv("MOTOS_PER_PAGE", "25"))
+MOTOS_MAX_PER_PAGE = int(os.getenv("MOTOS_MAX_PER_PAGE", "200"))
+# Tokens aceptados por el backend que se recuerdan (claves de cache_key)
+MOTOS_INDEX_MAX_TOKENS = int(os.getenv("MOTOS_INDEX_MAX_TOKENS", "10000"))
+
+
+class _TableParser(HTMLParser):
+    """Extrae cabeceras y filas de la primera tabla HTML del backend."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.columns = []
+        self.rows = []
+        self._row = None
+        self._cell = None
+        self._header_row = False
+        self._depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            self._depth += 1
+        elif self._depth != 1:
+            return
+        elif tag == "tr":
+            self._row = []
+            self._header_row = False
+        elif tag in ("td", "th") and self._row is not None:
+            self._cell = []
+            if tag == "th":
+                self._header_row = True
+
+    def handle_endtag(self, tag):
+        if tag == "table":
+            self._depth -= 1
+        elif self._depth != 1:
+            return
+        elif tag in ("td", "th") and self._cell is not None:
+            self._row.append(" ".join("".join(self._cell).split()))
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            if self._header_row and not self.columns:
+                self.columns = self._row
+            elif self._row:
+                self.rows.append(tuple(self._row))
+            self._row = None
+
+    def handle_data(self, data):
+        if self._cell is not None and self._depth == 1:
+            self._cell.append(data)
+
+
+# Número al principio de la celda ("125 cc", "-3.5", "1e3 km"); "NaN" e
+# "inf" no cuentan como números
+_LEADING_NUMBER = re.compile(r"\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)")
+
+
+def _sort_key(value):
+    # Orden natural: las celdas que empiezan con un número se ordenan por ese
+    # número (y luego por el resto del texto) y van antes que el texto puro
+    match = _LEADING_NUMBER.match(value)
+    if match:
+        number = float(match.group(1))
+        if math.isfinite(number):
+            return (0, number, value[match.end():].strip().casefold())
+    return (1, 0.0, value.casefold())
+
+
+class MotorcycleIndex:
+    """Copia compacta en memoria de la tabla de motos con índices por columna.
+
+    Cada columna guarda sus claves ordenadas y la posición de cada fila en
+    ese orden, de modo que ordenar, paginar y filtrar por igualdad no
+    requiere volver a recorrer ni a ordenar toda la tabla.
+    """
+
+    def __init__(self, ttl=MOTOS_INDEX_TTL, max_tokens=MOTOS_INDEX_MAX_TOKENS):
+        self.ttl = ttl
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self._refreshing = False
+        # cache_key(token) -> momento en que el backend lo aceptó, en orden LRU
+        self._tokens = OrderedDict()
+        self._loaded_at = None
+        self._digest = None
+        # (columnas, filas, texto de búsqueda, ids ordenados, claves, rango)
+        self._data = ((), (), (), {}, {}, {})
+
+    @property
+    def loaded(self):
+        return self._loaded_at is not None
+
+    def is_stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def refresh(self, key, fetch):
+        """Valida el token de ``key`` y recarga el índice si venció.
+
+        ``fetch() -> (status, html)`` pide la tabla con el token del usuario.
+        El índice es compartido, así que solo se evita la llamada si el
+        backend aceptó ese mismo token hace menos de ``ttl`` segundos. Un
+        solo hilo recarga a la vez; los demás solo validan su token.
+        Devuelve el status del backend, o 200 si no hizo falta consultarlo.
+        """
+        with self._lock:
+            accepted_at = self._tokens.get(key)
+            fresh_token = accepted_at is not None and time.monotonic() - accepted_at <= self.ttl
+            if fresh_token and (not self.is_stale() or (self._refreshing and self.loaded)):
+                return 200
+            loader = not self._refreshing
+            self._refreshing = True
+        try:
+            status, html = fetch()
+            if status == 200:
+                if (loader and self.is_stale()) or not self.loaded:
+                    self.load(html)
+                self._accept(key)
+            elif status == 401:
+                self.revoke(key)
+            return status
+        finally:
+            if loader:
+                with self._lock:
+                    self._refreshing = False
+
+    def is_authorized(self, key):
+        """``True`` si el backend aceptó el token de ``key`` y no lo rechazó después."""
+        with self._lock:
+            return key in self._tokens
+
+    def revoke(self, key):
+        with self._lock:
+            self._tokens.pop(key, None)
+
+    def _accept(self, key):
+        with self._lock:
+            self._tokens[key] = time.monotonic()
+            self._tokens.move_to_end(key)
+            while len(self._tokens) > self.max_tokens:
+                self._tokens.popitem(last=False)
+
+    def load(self, html):
+        digest = hashlib.sha256(html.encode("utf-8")).digest()
+        if digest == self._digest:
+            self._loaded_at = time.monotonic()
+            return
+
+        parser = _TableParser()
+        parser.feed(html)
+        parser.close()
+        rows = tuple(parser.rows)
+        width = max([len(parser.columns)] + [len(row) for row in rows])
+        columns = list(parser.columns) + [f"col{i + 1}" for i in range(len(parser.columns), width)]
+        rows = tuple(row + ("",) * (width - len(row)) for row in rows)
+
+        sorted_ids, keys, rank = {}, {}, {}
+        for col in range(width):
+            order = sorted(range(len(rows)), key=lambda i: _sort_key(rows[i][col]))
+            positions = [0] * len(rows)
+            for pos, row_id in enumerate(order):
+                positions[row_id] = pos
+            sorted_ids[col] = order
+            keys[col] = [_sort_key(rows[i][col]) for i in order]
+            rank[col] = positions
+
+        search = tuple(" ".join(row).casefold() for row in rows)
+        # Se sustituye todo de una vez para que los lectores vean un índice coherente
+        self._data = (tuple(columns), rows, search, sorted_ids, keys, rank)
+        self._digest = digest
+        self._loaded_at = time.monotonic()
+
+    @property
+    def columns(self):
+        return self._data[0]
+
+    def __len__(self):
+        return len(self._data[1])
+
+    @staticmethod
+    def _column_index(columns, name):
+        if not name:
+            return None
+        name = name.casefold()
+        for i, column in enumerate(columns):
+            if column.casefold() == name:
+                return i
+        return None
+
+    def query(self, page=1, per_page=MOTOS_PER_PAGE, sort=None, order="asc",
+              q=None, filters=None):
+        """Devuelve una página de filas filtradas y ordenadas.
+
+        ``filters`` es un diccionario columna -> valor exacto; ``q`` busca
+        el texto en cualquier columna.
+        """
+        columns, rows, search, sorted_ids, keys, rank = self._data
+        per_page = max(1, min(per_page, MOTOS_MAX_PER_PAGE))
+        page = max(1, page)
+        sort_col = self._column_index(columns, sort)
+        descending = order == "desc"
+
+        candidates = None
+        applied = {}
+        for name, value in (filters or {}).items():
+            col = self._column_index(columns, name)
+            if col is None:
+                continue
+            applied[columns[col]] = value
+            key = _sort_key(value)
+            lo, hi = bisect_left(keys[col], key), bisect_right(keys[col], key)
+            matches = set(sorted_ids[col][lo:hi])
+            candidates = matches if candidates is None else candidates & matches
+
+        if q:
+            needle = q.casefold()
+            pool = range(len(rows)) if candidates is None else candidates
+            candidates = {i for i in pool if needle in search[i]}
+
+        start = (page - 1) * per_page
+        if candidates is None:
+            # Sin filtros basta con cortar el índice ya ordenado
+            total = len(rows)
+            ids = range(len(rows)) if sort_col is None else sorted_ids[sort_col]
+            if descending:
+                positions = range(total - 1 - start, max(total - 1 - start - per_page, -1), -1)
+                page_ids = [ids[pos] for pos in positions]
+            else:
+                page_ids = ids[start:start + per_page]
+        else:
+            total = len(candidates)
+            if sort_col is None:
+                ids = sorted(candidates, reverse=descending)
+            else:
+                ids = sorted(candidates, key=rank[sort_col].__getitem__, reverse=descending)
+            page_ids = ids[start:start + per_page]
+
+        return {
+            "columns": list(columns),
+            "rows": [list(rows[i]) for i in page_ids],
+            "page": page,
+            "per_page": per_page,
+            "total": total,
+            "pages": (total + per_page - 1) // per_page,
+            "sort": columns[sort_col] if sort_col is not None else None,
+            "order": "desc" if descending else "asc",
+            "q": q or "",
+            "filters": applied,
+        }
+
+
+# Índice compartido por todas las vistas del worker
+motos_index = MotorcycleIndex()
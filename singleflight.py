@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo coalescencia dentro del proceso
+    fcntl = None
+
+# ----------------------------------------
+# Configuración de la coalescencia de peticiones
+# ----------------------------------------
+# Directorio para coordinar workers de gunicorn con locks de archivo.
+# Vacío = solo se agrupan peticiones entre hilos del mismo worker.
+SINGLEFLIGHT_DIR = os.getenv("SINGLEFLIGHT_DIR", "")
+# Segundos que sobreviven en disco los archivos de una clave sin uso; debe
+# superar la llamada al backend más larga esperable (~20 s)
+SINGLEFLIGHT_FILE_TTL = float(os.getenv("SINGLEFLIGHT_FILE_TTL", "30"))
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Agrupa llamadas idénticas concurrentes en una sola ejecución.
+
+    El primer hilo que llega con una clave ejecuta ``fn``; los demás
+    esperan y reciben el mismo resultado (o la misma excepción).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._execute(key, fn)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def _execute(self, key, fn):
+        return fn()
+
+
+class SharedSingleFlight(SingleFlight):
+    """Coalescencia también entre procesos mediante ``flock``.
+
+    El líder de cada worker toma un lock exclusivo por clave. Un worker
+    que encuentra el lock tomado deja una marca de espera; solo si hay
+    marca el líder escribe el resultado en disco, y el que esperaba lo
+    reutiliza si se escribió después de que empezara a esperar. Los
+    archivos sin uso se borran pasados ``file_ttl`` segundos. Los
+    resultados deben ser tuplas serializables en JSON.
+    """
+
+    def __init__(self, directory, file_ttl=SINGLEFLIGHT_FILE_TTL):
+        super().__init__()
+        self.directory = directory
+        self.file_ttl = file_ttl
+        self._last_sweep = 0.0
+        # Los resultados guardan tablas de usuarios en claro: solo se acepta
+        # un directorio propio y cerrado para los demás
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        stat = os.lstat(directory)
+        if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+            raise RuntimeError(f"SINGLEFLIGHT_DIR={directory} debe pertenecer al usuario "
+                               "actual y no tener permisos para otros")
+
+    def _paths(self, key):
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, digest)
+        return base + ".lock", base + ".wait", base + ".json"
+
+    def _execute(self, key, fn):
+        self._sweep()
+        lock_path, wait_path, result_path = self._paths(key)
+        arrived = time.time()
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        try:
+            # Se renueva el mtime para que la limpieza no borre un lock en uso
+            os.utime(fd)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                _touch(wait_path)
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                shared = self._read_result(result_path, arrived)
+                if shared is not None:
+                    return shared
+
+            acquired = time.time()
+            result = fn()
+            # Sin nadie esperando no se paga la escritura en disco
+            if _mtime(wait_path) >= acquired:
+                self._write_result(result_path, result)
+            return result
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _read_result(self, path, arrived):
+        try:
+            if os.stat(path).st_mtime < arrived:
+                return None
+            with open(path, "r", encoding="utf-8") as fh:
+                return tuple(json.load(fh))
+        except (OSError, ValueError):
+            return None
+
+    def _write_result(self, path, result):
+        # Nombre impredecible y creado en exclusiva: nunca sigue un enlace
+        tmp = f"{path}.{secrets.token_hex(8)}.tmp"
+        try:
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+        except OSError:
+            # El que espera repite la llamada por su cuenta
+            return
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(result, fh)
+        os.replace(tmp, path)
+
+    def _sweep(self):
+        # Los resultados contienen datos de usuarios: no se dejan en disco
+        now = time.time()
+        if now - self._last_sweep < self.file_ttl / 2:
+            return
+        self._last_sweep = now
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if now - _mtime(path) > self.file_ttl:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+
+def _touch(path):
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+    try:
+        os.utime(fd)
+    finally:
+        os.close(fd)
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return 0.0
+
+
+def make_singleflight(directory=SINGLEFLIGHT_DIR):
+    if directory and fcntl is not None:
+        return SharedSingleFlight(directory)
+    return SingleFlight()
+
+
+# Coalescencia de las llamadas GET al backend
+backend_flight = make_singleflight()